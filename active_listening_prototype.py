@@ -2,6 +2,7 @@
 import streamlit as st
 from openai import OpenAI
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import os
 
 # Load API key from environment variable
@@ -13,6 +14,14 @@ if not api_key:
 # Initialize OpenAI client
 client = OpenAI(api_key=api_key)
 
+FOLLOW_UP_QUESTIONS = [
+    "What was the main issue discussed in the conversation?",
+    "Can you summarize the feedback provided by the team members?",
+    "How did the context of the project influence the conversation?",
+    "What were the key points raised by each team member?",
+    "What actions were decided upon at the end of the meeting?"
+]
+
 def generate_scenario(industry):
     prompt = f"Create a detailed role-playing scenario for a project team meeting in the {industry} industry. Provide background information about the project and list the team members and their roles."
     response = client.chat.completions.create(
@@ -52,6 +61,51 @@ def provide_feedback(response):
     feedback = f"Feedback based on your response: {response}"
     return feedback
 
+def evaluate_follow_up(question, answer, scenario, transcript):
+    prompt = f"""Scenario:
+{scenario}
+
+Conversation transcript:
+{transcript}
+
+Follow-up question: {question}
+Learner's answer: {answer}
+
+Assess how accurately and completely the learner's answer reflects what was said in the conversation. Give brief, constructive feedback and point out anything important they missed."""
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are an expert coach assessing a learner's active listening skills."},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return response.choices[0].message.content
+
+def grade_follow_ups(questions, answers, scenario, transcript):
+    # Feedback is cached per question and answer, so only new or changed answers are sent for grading
+    cache = st.session_state.setdefault("follow_up_feedback", {})
+    pending = [(q, a) for q, a in zip(questions, answers) if a and (q, a) not in cache]
+
+    def grade(question, answer):
+        # Errors are returned rather than raised so one failed answer doesn't lose the others
+        try:
+            return evaluate_follow_up(question, answer, scenario, transcript), None
+        except Exception as e:
+            return None, e
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            results = list(executor.map(lambda qa: grade(*qa), pending))
+
+        # Only successful grades are cached, so resubmitting retries just the failures
+        for (question, answer), (feedback, error) in zip(pending, results):
+            if error:
+                st.error(f"An error occurred while grading your answer to \"{question}\": {str(error)}")
+            else:
+                cache[(question, answer)] = feedback
+
+    return [cache.get((q, a)) for q, a in zip(questions, answers)]
+
 # Streamlit app layout
 st.title("Active Listening Practice App")
 
@@ -68,6 +122,7 @@ if selected_industry:
         st.session_state.scenario = scenario
         st.session_state.conversation = conversation.split("\n\n")
         st.session_state.current_step = 0
+        st.session_state.follow_up_feedback = {}
 
 if 'scenario' in st.session_state:
     st.header("Scenario Background")
@@ -106,16 +161,26 @@ if 'scenario' in st.session_state:
 
             # Follow-up questions
             st.header("Follow-Up Questions")
-            follow_up_questions = [
-                "What was the main issue discussed in the conversation?",
-                "Can you summarize the feedback provided by the team members?",
-                "How did the context of the project influence the conversation?",
-                "What were the key points raised by each team member?",
-                "What actions were decided upon at the end of the meeting?"
-            ]
-
-            for i, question in enumerate(follow_up_questions):
-                user_answer = st.text_input(f"Follow-Up Question {i + 1}: {question}", key=f"follow_up_{i}")
-                if user_answer:
-                    follow_up_feedback = provide_feedback(user_answer)
+            # Collect every answer in one submission, then grade them together
+            with st.form("follow_up_form"):
+                answers = [
+                    st.text_input(f"Follow-Up Question {i + 1}: {question}", key=f"follow_up_{i}")
+                    for i, question in enumerate(FOLLOW_UP_QUESTIONS)
+                ]
+                submitted = st.form_submit_button("Submit Answers")
+
+            if submitted:
+                if not any(answers):
+                    st.write("Please answer at least one question before submitting.")
+                else:
+                    with st.spinner("Reviewing your answers..."):
+                        transcript = "\n\n".join(st.session_state.conversation)
+                        grade_follow_ups(FOLLOW_UP_QUESTIONS, answers, st.session_state.scenario, transcript)
+
+            # Drawn from the cache on every run so the review stays on screen across reruns
+            cache = st.session_state.get("follow_up_feedback", {})
+            for i, (question, answer) in enumerate(zip(FOLLOW_UP_QUESTIONS, answers)):
+                follow_up_feedback = cache.get((question, answer))
+                if follow_up_feedback:
+                    st.subheader(f"Follow-Up Question {i + 1}")
                     st.write(follow_up_feedback)
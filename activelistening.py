@@ -17,9 +17,24 @@ def generate_response(prompt):
     except Exception as e:
         return f"Error: {str(e)}"
 
+# Number of messages shown per page of conversation history
+HISTORY_PAGE_SIZE = 10
+
+# Render a single message to markdown
+def render_message(speaker, message):
+    if speaker == "User":
+        return f"**You:** {message}"
+    return f"**ChatGPT:** {message}"
+
+# Show one more page of older messages
+def load_older_messages():
+    st.session_state.history_visible += HISTORY_PAGE_SIZE
+
 # Initialize session state for conversation history
 if 'conversation' not in st.session_state:
     st.session_state.conversation = []
+if 'history_visible' not in st.session_state:
+    st.session_state.history_visible = HISTORY_PAGE_SIZE
 
 # Streamlit app layout
 st.title("Active Listening Practice with ChatGPT")
@@ -61,13 +76,18 @@ if st.button("Send"):
         # Clear the input field
         st.text_input("Enter your message here:", value="", key="input_clear")
 
-# Display conversation history
+# Display conversation history, newest messages only; older ones are loaded on request
 st.subheader("Conversation History")
-for speaker, message in st.session_state.conversation:
-    if speaker == "User":
-        st.write(f"**You:** {message}")
-    else:
-        st.write(f"**ChatGPT:** {message}")
+history = st.session_state.conversation
+hidden = max(len(history) - st.session_state.history_visible, 0)
+
+if hidden:
+    st.button(f"Load older messages ({hidden} hidden)", on_click=load_older_messages)
+
+# Each message gets its own element so one message's markdown can't spill into the next
+with st.container():
+    for speaker, message in history[hidden:]:
+        st.markdown(render_message(speaker, message))
 
 # Feedback Section (Optional)
 st.header("Feedback")
@@ -0,0 +1,253 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import openai
+import streamlit as st
+import streamlit.config
+import streamlit.logger
+
+from benchmarks.replay import ReplayClient
+
+BENCHMARK_DIR = Path(__file__).parent
+FIXTURE_PATH = BENCHMARK_DIR / "fixtures" / "learner_flow.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+INDUSTRY = "Technology"
+LEARNER_REPLY = "That sounds stressful. So the main thing is giving St. Mary's a clear answer by Friday?"
+LEARNER_ANSWER = "Priya is worried about losing the client and needs a plan she can share by Friday."
+FOLLOW_UP_ANSWERS = [
+    "Mismatched loan balances delayed the data migration.",
+    "Alice reported the test failures and Dana suspects a rounding issue.",
+    "The steering group deadline put pressure on the team.",
+    "Bob wants a fix, Alice has the test results, Dana owns the conversion step.",
+    "Patch the conversion, rerun by Wednesday and report on Thursday."
+]
+
+
+def quiet_streamlit():
+    # Streamlit warns on every UI call made outside `streamlit run`. The config option keeps the level
+    # when streamlit parses its config later; set_log_level covers loggers that already exist.
+    streamlit.config.set_option("logger.level", "error")
+    streamlit.logger.set_log_level(logging.ERROR)
+
+
+def load_app(module_name, client):
+    quiet_streamlit()
+
+    # The apps build their OpenAI client at import time, so the replay client has to be in place first
+    with mock.patch.object(openai, "OpenAI", return_value=client), \
+            mock.patch.object(st, "secrets", {"OPENAI_API_KEY": "replay"}), \
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "replay"}):
+        if module_name in sys.modules:
+            app = importlib.reload(sys.modules[module_name])
+        else:
+            app = importlib.import_module(module_name)
+    app.client = client
+    return app
+
+
+USAGE_KEYS = ("calls", "bytes_sent", "bytes_received")
+
+
+class StageTimer:
+    # Background endpoints run alongside the foreground stages, so they are left out of those
+    # stages and reported as a stage of their own with record()
+    def __init__(self, client, app_name, background=()):
+        self.client = client
+        self.app_name = app_name
+        self.background = background
+        self.results = {}
+
+    def usage(self, include_background):
+        stats = self.client.stats()
+        usage = {key: stats[key] for key in USAGE_KEYS}
+        if not include_background:
+            for name in self.background:
+                for key, value in stats["endpoints"].get(name, {}).items():
+                    usage[key] -= value
+        return usage
+
+    @contextmanager
+    def __call__(self, stage, include_background=False):
+        before = self.usage(include_background)
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        after = self.usage(include_background)
+        self.record(stage, seconds, {key: after[key] - before[key] for key in USAGE_KEYS})
+
+    def record(self, stage, seconds, usage):
+        self.results[f"{self.app_name}.{stage}"] = dict(usage, seconds=seconds)
+
+    def record_endpoints(self):
+        # Per-endpoint usage for the whole run; these have no timing of their own
+        for name, usage in sorted(self.client.stats()["endpoints"].items()):
+            self.results[f"{self.app_name}.api.{name}"] = usage
+
+
+def run_claude_active_2(app, timer):
+    # Session state outlives the module reload, so start each run with no prepared turns
+    st.session_state.speculative = {}
+
+    # Speech runs in the background, so each audio future is timed from submit until its result is ready
+    submitted, finished = {}, {}
+    synthesize_speech = app.synthesize_speech
+
+    def timed_synthesize_speech(text, *args, **kwargs):
+        audio = synthesize_speech(text, *args, **kwargs)
+        finished[text] = time.perf_counter()
+        return audio
+
+    def prepare(message):
+        submitted[message] = time.perf_counter()
+        return app.speculative_turn(message)
+
+    with mock.patch.object(app, "synthesize_speech", timed_synthesize_speech):
+        with timer("end_to_end", include_background=True):
+            with timer("scenario"):
+                scenario = app.clean_up_scenario(app.create_scenario(INDUSTRY))
+
+            # Each character message is prepared speculatively as soon as it lands, as in the app
+            with timer("conversation"):
+                conversation = app.conversation_engine(f"{scenario['person']}, the {scenario['role']}", scenario["context"])
+                opening = prepare(conversation["initial_message"])
+                reply = app.continue_conversation(conversation["thread_id"], conversation["assistant_id"], LEARNER_REPLY)
+                speculative = prepare(reply)
+
+            with timer("grading"):
+                for element in app.HURIER_ELEMENTS:
+                    app.analyze_response(element, LEARNER_ANSWER, reply, speculative["coach_context"])
+
+            opening["audio"].result()
+            speculative["audio"].result()
+
+    speech = timer.client.stats()["endpoints"].get("audio.speech.create", dict.fromkeys(USAGE_KEYS, 0))
+    timer.record("tts", sum(finished[message] - submitted[message] for message in submitted), speech)
+    timer.record_endpoints()
+
+
+def run_prototype(app, timer):
+    # Session state outlives the module reload, so start each run with no cached feedback
+    st.session_state.follow_up_feedback = {}
+
+    # generate_audio writes next to the app module; point it at a temporary directory instead
+    with tempfile.TemporaryDirectory() as audio_dir, \
+            mock.patch.object(app, "__file__", os.path.join(audio_dir, os.path.basename(app.__file__))):
+        run_prototype_stages(app, timer)
+    timer.record_endpoints()
+
+
+def run_prototype_stages(app, timer):
+    with timer("end_to_end"):
+        with timer("scenario"):
+            scenario = app.generate_scenario(INDUSTRY)
+            conversation = app.generate_conversation(scenario).split("\n\n")
+
+        with timer("tts"):
+            for dialogue in conversation:
+                speaker, text = dialogue.split(": ", 1)
+                app.generate_audio(text, "onyx" if speaker == "Bob" else "alloy")
+
+        with timer("grading"):
+            app.grade_follow_ups(app.FOLLOW_UP_QUESTIONS, FOLLOW_UP_ANSWERS, scenario, "\n\n".join(conversation))
+
+
+FLOWS = {
+    "claude_active_2": run_claude_active_2,
+    "active_listening_prototype": run_prototype
+}
+
+# Endpoints each flow calls in the background rather than inside a stage
+BACKGROUND_ENDPOINTS = {
+    "claude_active_2": ("audio.speech.create",)
+}
+
+
+def run_benchmarks(fixture_path, repeat):
+    runs = []
+    for _ in range(repeat):
+        results = {}
+        for module_name, flow in FLOWS.items():
+            client = ReplayClient.from_file(fixture_path)
+            timer = StageTimer(client, module_name, BACKGROUND_ENDPOINTS.get(module_name, ()))
+            flow(load_app(module_name, client), timer)
+            results.update(timer.results)
+        runs.append(results)
+
+    # Call counts and bytes are deterministic; timings use the median across runs
+    summary = runs[0]
+    for stage, result in summary.items():
+        if "seconds" in result:
+            result["seconds"] = statistics.median(run[stage]["seconds"] for run in runs)
+    return summary
+
+
+def find_regressions(results, baseline):
+    tolerance = baseline["tolerance"]
+    regressions = []
+    for stage, expected in baseline["stages"].items():
+        actual = results.get(stage)
+        if actual is None:
+            regressions.append(f"{stage}: stage missing from results")
+            continue
+        if "seconds" in expected and actual["seconds"] > expected["seconds"] * (1 + tolerance) + baseline["min_seconds_slack"]:
+            regressions.append(f"{stage}: {actual['seconds']:.3f}s vs baseline {expected['seconds']:.3f}s")
+        if actual["calls"] > expected["calls"]:
+            regressions.append(f"{stage}: {actual['calls']} API calls vs baseline {expected['calls']}")
+        for key in ("bytes_sent", "bytes_received"):
+            if actual[key] > expected[key] * (1 + tolerance):
+                regressions.append(f"{stage}: {actual[key]} {key.replace('_', ' ')} vs baseline {expected[key]}")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'stage':<56}{'seconds':>10}{'calls':>8}{'KB sent':>10}{'KB recv':>10}")
+    for stage, result in results.items():
+        seconds = f"{result['seconds']:.3f}" if "seconds" in result else "-"
+        print(f"{stage:<56}{seconds:>10}{result['calls']:>8}"
+              f"{result['bytes_sent'] / 1024:>10.1f}{result['bytes_received'] / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the learner flow against a replayed API fixture.")
+    parser.add_argument("--fixture", default=FIXTURE_PATH, help="Recorded API fixture to replay")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline to compare against")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs; timings use the median")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown when writing a baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.fixture, args.repeat)
+    print_report(results)
+
+    if args.update_baseline:
+        baseline = {"tolerance": args.tolerance, "min_seconds_slack": 0.05, "stages": results}
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        regressions = find_regressions(results, json.load(baseline_file))
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
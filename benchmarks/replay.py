@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+
+class Record(SimpleNamespace):
+    # Recorded payload with attribute-only access, like the SDK objects the apps use
+    @classmethod
+    def wrap(cls, value):
+        if isinstance(value, dict):
+            return cls(**{key: cls.wrap(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return [cls.wrap(item) for item in value]
+        return value
+
+
+class SpeechResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def stream_to_file(self, path):
+        Path(path).write_bytes(self.content)
+
+
+class ReplayClient:
+    # Stands in for the OpenAI client: answers each call from a recorded fixture after a fixed delay
+    def __init__(self, fixture):
+        self.responses = fixture["responses"]
+        self.latency_ms = fixture["latency_ms"]
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.endpoints = {}
+        self.sequence_positions = {}
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.endpoint("chat.completions.create")))
+        self.audio = SimpleNamespace(speech=SimpleNamespace(create=self.endpoint("audio.speech.create")))
+        self.beta = SimpleNamespace(
+            assistants=SimpleNamespace(create=self.endpoint("beta.assistants.create")),
+            threads=SimpleNamespace(
+                create=self.endpoint("beta.threads.create"),
+                runs=SimpleNamespace(
+                    create=self.endpoint("beta.threads.runs.create"),
+                    retrieve=self.endpoint("beta.threads.runs.retrieve")
+                ),
+                messages=SimpleNamespace(
+                    create=self.endpoint("beta.threads.messages.create"),
+                    list=self.endpoint("beta.threads.messages.list")
+                )
+            )
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as fixture_file:
+            return cls(json.load(fixture_file))
+
+    def endpoint(self, name):
+        return lambda **request: self.call(name, request)
+
+    def call(self, name, request):
+        body = json.dumps(request, sort_keys=True, default=str)
+        recorded = self.match(name, body)
+
+        if "sequence" in recorded:
+            # Bodies recorded in call order; the last one repeats once the sequence runs out
+            with self.lock:
+                position = self.sequence_positions.get(name, 0)
+                self.sequence_positions[name] = position + 1
+            recorded = {"body": recorded["sequence"][min(position, len(recorded["sequence"]) - 1)]}
+
+        if "audio_bytes" in recorded:
+            content = bytes(recorded["audio_bytes"])
+            response, received = SpeechResponse(content), len(content)
+        else:
+            response, received = Record.wrap(recorded["body"]), len(json.dumps(recorded["body"]))
+
+        time.sleep(self.latency_ms.get(name, self.latency_ms["default"]) / 1000)
+
+        with self.lock:
+            self.calls += 1
+            self.bytes_sent += len(body)
+            self.bytes_received += received
+            endpoint = self.endpoints.setdefault(name, {"calls": 0, "bytes_sent": 0, "bytes_received": 0})
+            endpoint["calls"] += 1
+            endpoint["bytes_sent"] += len(body)
+            endpoint["bytes_received"] += received
+        return response
+
+    def match(self, name, body):
+        # The first recorded response whose match string appears in the request wins
+        for recorded in self.responses.get(name, []):
+            if recorded.get("match", "") in body:
+                return recorded
+        raise KeyError(f"No recorded response for {name} matching request: {body[:200]}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "endpoints": {name: dict(usage) for name, usage in self.endpoints.items()}
+            }
@@ -1,6 +1,7 @@
 import streamlit as st
 from openai import OpenAI
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Initialize OpenAI client with API key from Streamlit secrets
 client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
@@ -15,6 +16,14 @@ HURIER_QUESTIONS = {
     "Evaluate": "How would you evaluate the importance or relevance of this message?",
     "Respond": "How would you respond to this message?"
 }
+TTS_VOICE = "alloy"
+
+# Background workers for speculative work that doesn't depend on the learner's answer.
+# Each session gets its own small pool that lives as long as the session, so learners don't queue behind each other.
+def get_executor():
+    if "executor" not in st.session_state:
+        st.session_state.executor = ThreadPoolExecutor(max_workers=2)
+    return st.session_state.executor
 
 def create_scenario(industry):
     prompt = f"""Create a unique and detailed workplace scenario in the {industry} industry. Be creative and include unexpected elements. Include:
@@ -33,7 +42,7 @@ def create_scenario(industry):
             ]
         )
         
-        scenario = json.loads(response.choices[0].message["content"])
+        scenario = json.loads(response.choices[0].message.content)
         return scenario
     except Exception as e:
         st.error(f"An error occurred while creating the scenario: {str(e)}")
@@ -71,7 +80,7 @@ def clean_up_scenario(scenario):
             ]
         )
 
-        clean_scenario = json.loads(response.choices[0].message["content"])
+        clean_scenario = json.loads(response.choices[0].message.content)
         return clean_scenario
     except Exception as e:
         st.error(f"An error occurred while cleaning up the scenario: {str(e)}")
@@ -89,24 +98,24 @@ def conversation_engine(character, context):
         thread = client.beta.threads.create()
 
         run = client.beta.threads.runs.create(
-            thread_id=thread["id"],
-            assistant_id=assistant["id"],
+            thread_id=thread.id,
+            assistant_id=assistant.id,
             instructions="Please provide an opening statement to start the conversation."
         )
 
-        while run["status"] != "completed":
-            run = client.beta.threads.runs.retrieve(thread_id=thread["id"], run_id=run["id"])
+        while run.status in ("queued", "in_progress"):
+            run = client.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
 
-        if run["finish_reason"] == "length":
+        if run.status == "incomplete":
             st.warning("The response was cut off due to length. Please try again with a shorter input.")
             return None
 
-        messages = client.beta.threads.messages.list(thread_id=thread["id"])
-        initial_message = messages["data"][0]["content"][0]["text"]["value"]
+        messages = client.beta.threads.messages.list(thread_id=thread.id)
+        initial_message = messages.data[0].content[0].text.value
 
         return {
-            "thread_id": thread["id"],
-            "assistant_id": assistant["id"],
+            "thread_id": thread.id,
+            "assistant_id": assistant.id,
             "initial_message": initial_message
         }
 
@@ -116,26 +125,22 @@ def conversation_engine(character, context):
 
 def continue_conversation(thread_id, assistant_id, user_message):
     try:
-        client.beta.threads.messages.create(
-            thread_id=thread_id,
-            role="user",
-            content=user_message
-        )
-
+        # The thread and assistant are already warm, so the learner's message and the run go out in one call
         run = client.beta.threads.runs.create(
             thread_id=thread_id,
-            assistant_id=assistant_id
+            assistant_id=assistant_id,
+            additional_messages=[{"role": "user", "content": user_message}]
         )
 
-        while run["status"] != "completed":
-            run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run["id"])
+        while run.status in ("queued", "in_progress"):
+            run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
 
-        if run["finish_reason"] == "length":
+        if run.status == "incomplete":
             st.warning("The response was cut off due to length. Please try again with a shorter input.")
             return None
 
         messages = client.beta.threads.messages.list(thread_id=thread_id)
-        assistant_response = messages["data"][0]["content"][0]["text"]["value"]
+        assistant_response = messages.data[0].content[0].text.value
 
         return assistant_response
 
@@ -143,12 +148,54 @@ def continue_conversation(thread_id, assistant_id, user_message):
         st.error(f"An error occurred while continuing the conversation: {str(e)}")
         return None
 
-def analyze_response(element, user_response, assistant_message):
-    prompt = f"""
+def synthesize_speech(text, voice=TTS_VOICE):
+    response = client.audio.speech.create(
+        model="tts-1",
+        voice=voice,
+        input=text
+    )
+    return response.content
+
+def build_coach_context(assistant_message):
+    # Prompt templates for every HURIER element; only the learner's response is filled in later
+    return {element: coach_prompt_template(element, assistant_message) for element in HURIER_ELEMENTS}
+
+def prepare_next_turn(assistant_message):
+    # Runs as soon as a character message lands, while the learner is still reading and typing
+    return {
+        "coach_context": build_coach_context(assistant_message),
+        "audio": get_executor().submit(synthesize_speech, assistant_message)
+    }
+
+def speculative_turn(assistant_message):
+    # Prepared turns are kept per message, so each message is only synthesized once
+    speculative = st.session_state.setdefault("speculative", {})
+    if assistant_message not in speculative:
+        speculative[assistant_message] = prepare_next_turn(assistant_message)
+    return speculative[assistant_message]
+
+@st.fragment(run_every="1s")
+def wait_for_audio(audio):
+    # Polls until the audio is ready, then reruns the page once so the player is shown
+    if audio.done():
+        st.rerun()
+    st.caption("Preparing audio...")
+
+def play_character_audio(assistant_message):
+    audio = speculative_turn(assistant_message)["audio"]
+    if not audio.done():
+        wait_for_audio(audio)
+    elif audio.exception():
+        st.caption("Audio is unavailable for this message.")
+    else:
+        st.audio(audio.result(), format="audio/mp3")
+
+def coach_prompt_template(element, assistant_message):
+    return f"""
     Analyze the learner's response for the '{element}' element of the HURIER model.
     
     Assistant's message: "{assistant_message}"
-    Learner's response: "{user_response}"
+    Learner's response: "{{user_response}}"
     
     Evaluate if the learner's response accurately reflects the quality of the '{element}' element.
     Provide constructive feedback that is positive, clear, and concrete.
@@ -160,6 +207,11 @@ def analyze_response(element, user_response, assistant_message):
     The response should be marked as "passed" if the learner demonstrated a good understanding of the '{element}' element, and "failed" if their response needs improvement.
     """
 
+def analyze_response(element, user_response, assistant_message, coach_context=None):
+    if coach_context is None:
+        coach_context = build_coach_context(assistant_message)
+    prompt = coach_context[element].replace("{user_response}", user_response)
+
     try:
         response = client.chat.completions.create(
             model="gpt-4",
@@ -170,13 +222,13 @@ def analyze_response(element, user_response, assistant_message):
             ]
         )
         
-        feedback = json.loads(response.choices[0].message["content"])
+        feedback = json.loads(response.choices[0].message.content)
         return feedback
     except Exception as e:
         st.error(f"An error occurred while analyzing the response: {str(e)}")
         return {"Evaluation": "failed", "Feedback": "Unable to analyze response due to an error."}
 
-def listening_skill_coach(assistant_message):
+def listening_skill_coach(assistant_message, coach_context=None):
     st.subheader("Listening Skill Coach")
     st.write("Let's analyze your listening skills using the HURIER model.")
     
@@ -187,7 +239,7 @@ def listening_skill_coach(assistant_message):
         user_response = st.text_input(f"Your answer for {element}:", key=f"input_{element}")
         
         if st.button(f"Submit {element}", key=f"submit_{element}"):
-            feedback = analyze_response(element, user_response, assistant_message)
+            feedback = analyze_response(element, user_response, assistant_message, coach_context)
             st.write(feedback["Feedback"])
             
             if feedback["Evaluation"] == "failed":
@@ -213,6 +265,8 @@ def main():
             if clean_scenario:
                 st.session_state.clean_scenario = clean_scenario
                 st.session_state.conversation = None  # Reset conversation when new scenario is generated
+                st.session_state.assistant_response = None
+                st.session_state.speculative = {}
                 st.write("Scenario generated successfully!")
             else:
                 st.error("Failed to clean up the scenario.")
@@ -250,6 +304,7 @@ def main():
         if st.session_state.conversation:
             st.subheader("Conversation:")
             st.write("Character:", st.session_state.conversation["initial_message"])
+            play_character_audio(st.session_state.conversation["initial_message"])
 
             user_response = st.text_input("Your response:")
 
@@ -264,14 +319,21 @@ def main():
                     )
                     st.write(f"Assistant response: {assistant_response}")
                     if assistant_response:
-                        st.write("Character:", assistant_response)
-                        listening_skill_coach(assistant_response)
+                        st.session_state.assistant_response = assistant_response
+                        speculative_turn(assistant_response)
                     else:
                         st.error("Failed to get a response from the character.")
                         st.write("Failed to get assistant response.")
                 except Exception as e:
                     st.error(f"An error occurred during the conversation: {str(e)}")
                     st.write(f"Error during conversation continuation: {str(e)}")
+
+            # Kept in session state so the reply, its audio and the coach survive later reruns
+            assistant_response = st.session_state.get("assistant_response")
+            if assistant_response:
+                st.write("Character:", assistant_response)
+                play_character_audio(assistant_response)
+                listening_skill_coach(assistant_response, speculative_turn(assistant_response)["coach_context"])
         else:
             st.write("Waiting for conversation to initialize...")
     else: